@@ -0,0 +1,149 @@
+"""
+Textual Tetris Game - Batched Game Steps
+
+This module steps many games at once for headless workloads such as
+training or evaluating a bot. The games are stored as a structure of NumPy
+arrays (one row per game) rather than a list of GameState objects, so a
+single step moves, rotates and locks the current piece of every game with
+a few vectorized operations.
+
+It needs NumPy, which is installed with the ``fast`` extra. Spawning new
+pieces, scoring and game over are left to the caller, which can read the
+lock and line clear results returned by ``step``.
+"""
+
+from dataclasses import dataclass
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from textual_tetris_game.game import _SHAPES_FLAT, GameState
+
+# Action codes for step: the Direction values, plus a clockwise rotation
+LEFT = 0
+RIGHT = 1
+DOWN = 2
+ROTATE = 3
+
+# Cell offsets of every shape, indexed like _SHAPES_FLAT (``type * 4 + rotation``)
+# and shaped (shape, cell, row/col)
+_OFFSETS = np.array([entry[0] for entry in _SHAPES_FLAT], dtype=np.intp)
+_OFFSETS.flags.writeable = False
+
+# Change in (row, col, rotation) for each action code
+_ACTION_DELTAS = np.array([
+    (0, -1, 0),  # LEFT
+    (0, 1, 0),   # RIGHT
+    (1, 0, 0),   # DOWN
+    (0, 0, 1),   # ROTATE
+], dtype=np.intp)
+_ACTION_DELTAS.flags.writeable = False
+
+
+def _piece_cells(types: np.ndarray, rows: np.ndarray, cols: np.ndarray,
+                 rotations: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the (pieces, 4) row and column arrays of the cells of each piece."""
+    offsets = _OFFSETS[types * 4 + rotations]
+    return rows[:, None] + offsets[:, :, 0], cols[:, None] + offsets[:, :, 1]
+
+
+@dataclass(slots=True)
+class BatchState:
+    """
+    The boards and current pieces of many games (mutated in place).
+    
+    ``row_masks`` has one row of board bitmasks per game, shaped
+    ``(games, height)``, and the piece arrays hold one value per game.
+    """
+    width: int
+    height: int
+    row_masks: np.ndarray
+    piece_type: np.ndarray
+    piece_rotation: np.ndarray
+    piece_row: np.ndarray
+    piece_col: np.ndarray
+    
+    @classmethod
+    def from_states(cls, states: Sequence[GameState]) -> 'BatchState':
+        """Create a batch from game states that all have a current piece and the same board size."""
+        board = states[0].board
+        return cls(
+            width=board.width,
+            height=board.height,
+            row_masks=np.array([state.board.row_masks for state in states], dtype=np.int64),
+            piece_type=np.array([state.current_piece.type for state in states], dtype=np.intp),
+            piece_rotation=np.array([state.current_piece.rotation for state in states], dtype=np.intp),
+            piece_row=np.array([state.current_piece.position[0] for state in states], dtype=np.intp),
+            piece_col=np.array([state.current_piece.position[1] for state in states], dtype=np.intp),
+        )
+    
+    def is_valid(self, rows: np.ndarray, cols: np.ndarray, rotations: np.ndarray) -> np.ndarray:
+        """Check, for each game, if its piece is in bounds and unoccupied at the given placement."""
+        cell_rows, cell_cols = _piece_cells(self.piece_type, rows, cols, rotations)
+        in_bounds = (
+            (cell_rows >= 0) & (cell_rows < self.height) &
+            (cell_cols >= 0) & (cell_cols < self.width)
+        ).all(axis=1)
+        
+        # Clip the cells onto the board so out of bounds pieces can still be
+        # looked up; in_bounds already rules them out
+        cell_rows = np.clip(cell_rows, 0, self.height - 1)
+        cell_cols = np.clip(cell_cols, 0, self.width - 1)
+        games = np.arange(len(rows))[:, None]
+        occupied = (self.row_masks[games, cell_rows] >> cell_cols) & 1
+        return in_bounds & ~occupied.any(axis=1)
+    
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Apply one action to every game's current piece.
+        
+        Moves and rotations that would put a piece in an invalid position
+        are ignored, except that a blocked DOWN locks the piece and clears
+        the lines it completes, like ``move_tetromino``.
+        
+        Returns:
+            A boolean array of the games whose piece locked, which need a new
+            piece, and an array of the lines each game cleared.
+        """
+        deltas = _ACTION_DELTAS[actions]
+        rows = self.piece_row + deltas[:, 0]
+        cols = self.piece_col + deltas[:, 1]
+        rotations = (self.piece_rotation + deltas[:, 2]) & 3
+        
+        valid = self.is_valid(rows, cols, rotations)
+        self.piece_row = np.where(valid, rows, self.piece_row)
+        self.piece_col = np.where(valid, cols, self.piece_col)
+        self.piece_rotation = np.where(valid, rotations, self.piece_rotation)
+        
+        locked = ~valid & (actions == DOWN)
+        lines_cleared = np.zeros(len(actions), dtype=np.intp)
+        if locked.any():
+            lines_cleared[locked] = self._lock(np.flatnonzero(locked))
+        return locked, lines_cleared
+    
+    def _lock(self, games: np.ndarray) -> np.ndarray:
+        """Place the pieces of the given games and clear their completed lines."""
+        cell_rows, cell_cols = _piece_cells(
+            self.piece_type[games], self.piece_row[games], self.piece_col[games],
+            self.piece_rotation[games],
+        )
+        
+        # Leave out cells above the top of the board, which a negative index
+        # would otherwise wrap around to the bottom rows
+        on_board = cell_rows >= 0
+        cell_games = np.broadcast_to(games[:, None], cell_rows.shape)
+        np.bitwise_or.at(
+            self.row_masks, (cell_games[on_board], cell_rows[on_board]),
+            np.int64(1) << cell_cols[on_board],
+        )
+        
+        # Move each board's full rows to the top, keeping the order of the
+        # rest, then empty them
+        masks = self.row_masks[games]
+        full = masks == (1 << self.width) - 1
+        order = np.argsort(~full, axis=1, kind="stable")
+        masks = np.take_along_axis(masks, order, axis=1)
+        lines_cleared = full.sum(axis=1)
+        masks[np.arange(self.height) < lines_cleared[:, None]] = 0
+        self.row_masks[games] = masks
+        return lines_cleared
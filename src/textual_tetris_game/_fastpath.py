@@ -0,0 +1,136 @@
+"""
+Textual Tetris Game - Compiled Fast Path
+
+This module contains integer-only kernels for the board validity and hard
+drop inner loops. They are compiled with Numba when it is installed and run
+as plain Python otherwise, so results are the same either way.
+
+They are meant for headless callers that check many placements at once (such
+as a bot searching for a move); the interactive game keeps using the Board
+methods, for which the cost of calling into compiled code would outweigh the
+four cell checks it saves.
+"""
+
+from typing import Sequence
+
+from textual_tetris_game.game import _SHAPES_FLAT, Board, Tetromino, TetrominoType
+
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# Row and column offsets of every shape, indexed like _SHAPES_FLAT
+# (``type * 4 + rotation``), as parallel arrays when compiled. They use
+# the native int size rather than int8 so the arithmetic behaves the same with
+# NUMBA_DISABLE_JIT set, where int8 scalars would overflow when shifted.
+def _offset_table(index: int):
+    """Build the table of one offset coordinate (0 for rows, 1 for columns) of every shape."""
+    table = [
+        [offset[index] for offset in entry[0]] for entry in _SHAPES_FLAT
+    ]
+    if NUMBA_AVAILABLE:
+        array = np.array(table, dtype=np.intp)
+        array.flags.writeable = False
+        return array
+    return tuple(tuple(offsets) for offsets in table)
+
+
+SHAPE_ROW_OFFSETS = _offset_table(0)
+SHAPE_COL_OFFSETS = _offset_table(1)
+
+
+@njit(cache=True)
+def is_valid(row_masks: Sequence[int], width: int, height: int, piece_row: int, piece_col: int,
+             shape_drs: Sequence[int], shape_dcs: Sequence[int]) -> bool:
+    """Check if a piece's cells are all within bounds and unoccupied."""
+    for k in range(len(shape_drs)):
+        row = piece_row + shape_drs[k]
+        col = piece_col + shape_dcs[k]
+        if row < 0 or row >= height or col < 0 or col >= width:
+            return False
+        if (row_masks[row] >> col) & 1:
+            return False
+    return True
+
+
+@njit(cache=True)
+def hard_drop_delta(row_masks: Sequence[int], column_tops: Sequence[int], width: int, height: int,
+                    piece_row: int, piece_col: int,
+                    shape_drs: Sequence[int], shape_dcs: Sequence[int]) -> int:
+    """Get how many rows a valid piece falls before landing."""
+    # Distance each cell can fall before reaching the top of its column
+    drop = height
+    for k in range(len(shape_drs)):
+        distance = column_tops[piece_col + shape_dcs[k]] - 1 - (piece_row + shape_drs[k])
+        if distance < drop:
+            drop = distance
+    if drop >= 0:
+        return drop
+
+    # The piece is tucked under an overhang, so step it down row by row
+    drop = 0
+    while is_valid(row_masks, width, height, piece_row + drop + 1, piece_col, shape_drs, shape_dcs):
+        drop += 1
+    return drop
+
+
+@njit(cache=True)
+def hard_drop_columns(row_masks: Sequence[int], column_tops: Sequence[int], width: int, height: int,
+                      piece_row: int, shape_drs: Sequence[int], shape_dcs: Sequence[int],
+                      out: Sequence[int]) -> None:
+    """Fill ``out[col]`` with the landing row of a piece dropped from each column, or -1 where it is invalid."""
+    for col in range(width):
+        if is_valid(row_masks, width, height, piece_row, col, shape_drs, shape_dcs):
+            out[col] = piece_row + hard_drop_delta(
+                row_masks, column_tops, width, height, piece_row, col, shape_drs, shape_dcs,
+            )
+        else:
+            out[col] = -1
+
+
+def is_valid_tetromino(board: Board, tetromino: Tetromino) -> bool:
+    """Check if a tetromino is in a valid position on the board."""
+    index = tetromino.type * 4 + tetromino.rotation
+    row, col = tetromino.position
+    return is_valid(
+        board.row_masks, board.width, board.height, row, col,
+        SHAPE_ROW_OFFSETS[index], SHAPE_COL_OFFSETS[index],
+    )
+
+
+def hard_drop_row(board: Board, tetromino: Tetromino) -> int:
+    """Get the row a valid tetromino would land on if hard dropped."""
+    index = tetromino.type * 4 + tetromino.rotation
+    row, col = tetromino.position
+    return row + hard_drop_delta(
+        board.row_masks, board.column_tops, board.width, board.height, row, col,
+        SHAPE_ROW_OFFSETS[index], SHAPE_COL_OFFSETS[index],
+    )
+
+
+def landing_rows(board: Board, tetromino_type: TetrominoType, rotation: int, row: int) -> Sequence[int]:
+    """
+    Get the landing row of a piece hard dropped from each column of the board.
+    
+    The piece starts at the given row, and the result is indexed by column,
+    with -1 for columns where the piece is not in a valid position. Checking
+    a whole row of placements in one call keeps the cost of calling into
+    compiled code from dominating a placement search.
+    """
+    index = tetromino_type * 4 + rotation
+    out = np.empty(board.width, dtype=np.intp) if NUMBA_AVAILABLE else [0] * board.width
+    hard_drop_columns(
+        board.row_masks, board.column_tops, board.width, board.height, row,
+        SHAPE_ROW_OFFSETS[index], SHAPE_COL_OFFSETS[index], out,
+    )
+    return out
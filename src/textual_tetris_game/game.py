@@ -2,201 +2,480 @@
 Textual Tetris Game - Game Logic
 
 This module contains the core game logic for the Textual Tetris Game.
-It follows functional programming principles with immutable data structures.
+Pieces and boards are immutable values; the engine functions
+update the GameState in place rather than rebuilding it on every move.
 """
 
-from dataclasses import dataclass
-from enum import Enum, auto
-from typing import Dict, List, Optional, Tuple, Union, Literal, Mapping
+import random
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from enum import IntEnum
+from typing import Deque, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple, Union, Literal, Mapping
 
 
 # Type definitions
-class TetrominoType(Enum):
+# These are IntEnums numbered from 0 so members can index tables directly and
+# hash and compare as plain ints.
+class TetrominoType(IntEnum):
     """Types of Tetromino pieces."""
-    I = auto()  # I-piece (long bar)
-    J = auto()  # J-piece
-    L = auto()  # L-piece
-    O = auto()  # O-piece (square)
-    S = auto()  # S-piece
-    T = auto()  # T-piece
-    Z = auto()  # Z-piece
+    I = 0  # I-piece (long bar)
+    J = 1  # J-piece
+    L = 2  # L-piece
+    O = 3  # O-piece (square)
+    S = 4  # S-piece
+    T = 5  # T-piece
+    Z = 6  # Z-piece
 
 
-class CellState(Enum):
+class CellState(IntEnum):
     """Possible states for a cell on the board."""
-    EMPTY = auto()
-    FILLED = auto()
-    GHOST = auto()  # For ghost piece
+    EMPTY = 0
+    FILLED = 1
+    GHOST = 2  # For ghost piece
 
 
-class Direction(Enum):
+class Direction(IntEnum):
     """Movement directions."""
-    LEFT = auto()
-    RIGHT = auto()
-    DOWN = auto()
+    LEFT = 0
+    RIGHT = 1
+    DOWN = 2
 
 
-class Rotation(Enum):
+class Rotation(IntEnum):
     """Rotation directions."""
-    CLOCKWISE = auto()
-    COUNTERCLOCKWISE = auto()
+    CLOCKWISE = 0
+    COUNTERCLOCKWISE = 1
 
 
-@dataclass(frozen=True)
-class Position:
-    """Represents a position on the board."""
-    row: int
-    col: int
-    
-    def move(self, direction: Direction) -> 'Position':
-        """Return a new position after moving in the given direction."""
-        if direction == Direction.LEFT:
-            return Position(self.row, self.col - 1)
-        elif direction == Direction.RIGHT:
-            return Position(self.row, self.col + 1)
-        elif direction == Direction.DOWN:
-            return Position(self.row + 1, self.col)
-        return self
+# Positions on the board are plain (row, col) tuples of ints, moved by the
+# (row, col) delta of each direction (indexed by Direction)
+_MOVE_DELTA: Tuple[Tuple[int, int], ...] = (
+    (0, -1),  # LEFT
+    (0, 1),   # RIGHT
+    (1, 0),   # DOWN
+)
+
+# Change in rotation state for each rotation direction (indexed by Rotation),
+# as a step modulo 4 (three clockwise steps for one counterclockwise) so it
+# can be masked with 3
+_ROT_DELTA: Tuple[int, ...] = (
+    1,  # CLOCKWISE
+    3,  # COUNTERCLOCKWISE
+)
 
 
 # Tetromino shape definitions
-# Each shape is defined as a list of relative positions for each rotation state (0, 90, 180, 270 degrees)
+# Each shape is defined as a tuple of relative positions for each rotation state (0, 90, 180, 270 degrees)
 # The positions are (row_offset, col_offset) from the tetromino's position
-TETROMINO_SHAPES: Dict[TetrominoType, List[List[Tuple[int, int]]]] = {
-    TetrominoType.I: [
-        [(0, 0), (0, -1), (0, 1), (0, 2)],   # 0 degrees
-        [(0, 0), (-1, 0), (1, 0), (2, 0)],   # 90 degrees
-        [(0, 0), (0, -1), (0, 1), (0, 2)],   # 180 degrees
-        [(0, 0), (-1, 0), (1, 0), (2, 0)]    # 270 degrees
-    ],
-    TetrominoType.J: [
-        [(0, 0), (0, -1), (0, 1), (-1, -1)],  # 0 degrees
-        [(0, 0), (-1, 0), (1, 0), (-1, 1)],   # 90 degrees
-        [(0, 0), (0, -1), (0, 1), (1, 1)],    # 180 degrees
-        [(0, 0), (-1, 0), (1, 0), (1, -1)]    # 270 degrees
-    ],
-    TetrominoType.L: [
-        [(0, 0), (0, -1), (0, 1), (-1, 1)],   # 0 degrees
-        [(0, 0), (-1, 0), (1, 0), (1, 1)],    # 90 degrees
-        [(0, 0), (0, -1), (0, 1), (1, -1)],   # 180 degrees
-        [(0, 0), (-1, 0), (1, 0), (-1, -1)]   # 270 degrees
-    ],
-    TetrominoType.O: [
-        [(0, 0), (0, 1), (-1, 0), (-1, 1)],  # 0 degrees
-        [(0, 0), (0, 1), (-1, 0), (-1, 1)],  # 90 degrees
-        [(0, 0), (0, 1), (-1, 0), (-1, 1)],  # 180 degrees
-        [(0, 0), (0, 1), (-1, 0), (-1, 1)]   # 270 degrees
-    ],
-    TetrominoType.S: [
-        [(0, 0), (0, -1), (-1, 0), (-1, 1)], # 0 degrees
-        [(0, 0), (-1, -1), (0, -1), (1, 0)], # 90 degrees
-        [(0, 0), (0, -1), (-1, 0), (-1, 1)], # 180 degrees
-        [(0, 0), (-1, -1), (0, -1), (1, 0)]  # 270 degrees
-    ],
-    TetrominoType.T: [
-        [(0, 0), (0, -1), (0, 1), (-1, 0)],  # 0 degrees
-        [(0, 0), (-1, 0), (1, 0), (0, 1)],   # 90 degrees
-        [(0, 0), (0, -1), (0, 1), (1, 0)],   # 180 degrees
-        [(0, 0), (-1, 0), (1, 0), (0, -1)]   # 270 degrees
-    ],
-    TetrominoType.Z: [
-        [(0, 0), (0, 1), (-1, -1), (-1, 0)], # 0 degrees
-        [(0, 0), (1, 0), (0, 1), (-1, 1)],   # 90 degrees
-        [(0, 0), (0, 1), (-1, -1), (-1, 0)], # 180 degrees
-        [(0, 0), (1, 0), (0, 1), (-1, 1)],   # 270 degrees
-    ]
-}
-
-
-@dataclass(frozen=True)
+# The outer tuple is indexed by TetrominoType, so it must stay in definition order
+TETROMINO_SHAPES: Tuple[Tuple[Tuple[Tuple[int, int], ...], ...], ...] = (
+    (  # TetrominoType.I
+        ((0, 0), (0, -1), (0, 1), (0, 2)),   # 0 degrees
+        ((0, 0), (-1, 0), (1, 0), (2, 0)),   # 90 degrees
+        ((0, 0), (0, -1), (0, 1), (0, 2)),   # 180 degrees
+        ((0, 0), (-1, 0), (1, 0), (2, 0))    # 270 degrees
+    ),
+    (  # TetrominoType.J
+        ((0, 0), (0, -1), (0, 1), (-1, -1)),  # 0 degrees
+        ((0, 0), (-1, 0), (1, 0), (-1, 1)),   # 90 degrees
+        ((0, 0), (0, -1), (0, 1), (1, 1)),    # 180 degrees
+        ((0, 0), (-1, 0), (1, 0), (1, -1))    # 270 degrees
+    ),
+    (  # TetrominoType.L
+        ((0, 0), (0, -1), (0, 1), (-1, 1)),   # 0 degrees
+        ((0, 0), (-1, 0), (1, 0), (1, 1)),    # 90 degrees
+        ((0, 0), (0, -1), (0, 1), (1, -1)),   # 180 degrees
+        ((0, 0), (-1, 0), (1, 0), (-1, -1))   # 270 degrees
+    ),
+    (  # TetrominoType.O
+        ((0, 0), (0, 1), (-1, 0), (-1, 1)),  # 0 degrees
+        ((0, 0), (0, 1), (-1, 0), (-1, 1)),  # 90 degrees
+        ((0, 0), (0, 1), (-1, 0), (-1, 1)),  # 180 degrees
+        ((0, 0), (0, 1), (-1, 0), (-1, 1))   # 270 degrees
+    ),
+    (  # TetrominoType.S
+        ((0, 0), (0, -1), (-1, 0), (-1, 1)), # 0 degrees
+        ((0, 0), (-1, -1), (0, -1), (1, 0)), # 90 degrees
+        ((0, 0), (0, -1), (-1, 0), (-1, 1)), # 180 degrees
+        ((0, 0), (-1, -1), (0, -1), (1, 0))  # 270 degrees
+    ),
+    (  # TetrominoType.T
+        ((0, 0), (0, -1), (0, 1), (-1, 0)),  # 0 degrees
+        ((0, 0), (-1, 0), (1, 0), (0, 1)),   # 90 degrees
+        ((0, 0), (0, -1), (0, 1), (1, 0)),   # 180 degrees
+        ((0, 0), (-1, 0), (1, 0), (0, -1))   # 270 degrees
+    ),
+    (  # TetrominoType.Z
+        ((0, 0), (0, 1), (-1, -1), (-1, 0)), # 0 degrees
+        ((0, 0), (1, 0), (0, 1), (-1, 1)),   # 90 degrees
+        ((0, 0), (0, 1), (-1, -1), (-1, 0)), # 180 degrees
+        ((0, 0), (1, 0), (0, 1), (-1, 1)),   # 270 degrees
+    )
+)
+
+# The same shapes flattened into one tuple for the hot paths, indexed by
+# ``type * 4 + rotation``. Each entry pairs the offsets with the shape's
+# (min_row, max_row, min_col, max_col) so whole-piece bounds checks can be
+# done before looking at individual cells, and with the shape packed into one
+# (row_offset, mask) pair per row it covers. Bit ``i`` of a mask is the cell
+# at column offset ``min_col + i``, so shifting the mask left by
+# ``col + min_col`` lines it up with a board row mask and a whole row of the
+# piece can be tested with one AND.
+def _shape_entry(
+    shape: Tuple[Tuple[int, int], ...],
+) -> Tuple[Tuple[Tuple[int, int], ...], int, int, int, int, Tuple[Tuple[int, int], ...]]:
+    """Build a flat shape table entry from a tuple of (row, col) offsets."""
+    row_offsets = [row_offset for row_offset, _ in shape]
+    col_offsets = [col_offset for _, col_offset in shape]
+    min_col = min(col_offsets)
+    
+    packed: Dict[int, int] = {}
+    for row_offset, col_offset in shape:
+        packed[row_offset] = packed.get(row_offset, 0) | 1 << (col_offset - min_col)
+    
+    return (
+        shape, min(row_offsets), max(row_offsets), min_col, max(col_offsets),
+        tuple(sorted(packed.items())),
+    )
+
+
+_SHAPES_FLAT = tuple(
+    _shape_entry(TETROMINO_SHAPES[tetromino_type][rotation])
+    for tetromino_type in TetrominoType
+    for rotation in range(4)
+)
+
+
+# The lowest cell of each column a shape covers, as (row_offset, col_offset)
+# pairs indexed like _SHAPES_FLAT. Only these cells can land first, so they
+# are all a hard drop has to look at.
+def _piece_bottoms(shape: Tuple[Tuple[int, int], ...]) -> Tuple[Tuple[int, int], ...]:
+    """Get the lowest (row, col) offset in each column of a shape."""
+    lowest: Dict[int, int] = {}
+    for row_offset, col_offset in shape:
+        lowest[col_offset] = max(row_offset, lowest.get(col_offset, row_offset))
+    return tuple((row_offset, col_offset) for col_offset, row_offset in sorted(lowest.items()))
+
+
+_PIECE_BOTTOMS = tuple(_piece_bottoms(entry[0]) for entry in _SHAPES_FLAT)
+
+
+def shape_offsets(tetromino_type: TetrominoType, rotation: int = 0) -> Tuple[Tuple[int, int], ...]:
+    """
+    Get the (row, col) offsets of a shape from the flat shape table.
+    
+    Everything that needs a shape's cells (pieces, hard drops, spawn checks
+    and rendering) reads them from this one table, which holds the same
+    tuples as TETROMINO_SHAPES.
+    """
+    return _SHAPES_FLAT[tetromino_type * 4 + rotation][0]
+
+
+@dataclass(frozen=True, slots=True)
 class Tetromino:
-    """Represents a tetromino piece."""
+    """
+    Represents a tetromino piece.
+    
+    Pieces are frozen because moves and rotations hand out shared, interned
+    instances (see ``_make_tetromino``).
+    """
     type: TetrominoType
-    position: Position
+    position: Tuple[int, int]  # (row, col)
     rotation: int = 0  # 0, 1, 2, or 3 (0, 90, 180, 270 degrees)
     
     def rotate(self, rotation: Rotation) -> 'Tetromino':
         """Return a new tetromino after rotation."""
-        new_rotation = (self.rotation + (1 if rotation == Rotation.CLOCKWISE else -1)) % 4
-        return Tetromino(self.type, self.position, new_rotation)
+        new_rotation = (self.rotation + _ROT_DELTA[rotation]) & 3
+        row, col = self.position
+        return _make_tetromino(self.type, row, col, new_rotation)
+    
+    def rotate_clockwise(self) -> 'Tetromino':
+        """
+        Return a new tetromino after a clockwise rotation.
+        
+        For callers that always rotate the same way, such as a move search,
+        without passing a Rotation each time.
+        """
+        row, col = self.position
+        return _make_tetromino(self.type, row, col, (self.rotation + 1) & 3)
+    
+    def rotate_counterclockwise(self) -> 'Tetromino':
+        """Return a new tetromino after a counterclockwise rotation (see ``rotate_clockwise``)."""
+        row, col = self.position
+        return _make_tetromino(self.type, row, col, (self.rotation + 3) & 3)
     
     def move(self, direction: Direction) -> 'Tetromino':
         """Return a new tetromino after moving in the given direction."""
-        return Tetromino(self.type, self.position.move(direction), self.rotation)
-    
-    def get_cells(self) -> List[Position]:
-        """Get the positions of all cells occupied by this tetromino."""
-        shape = TETROMINO_SHAPES[self.type][self.rotation]
-        return [
-            Position(self.position.row + row_offset, self.position.col + col_offset)
-            for row_offset, col_offset in shape
-        ]
+        row, col = self.position
+        row_delta, col_delta = _MOVE_DELTA[direction]
+        return _make_tetromino(self.type, row + row_delta, col + col_delta, self.rotation)
+    
+    def get_cells(self) -> FrozenSet[Tuple[int, int]]:
+        """
+        Get the (row, col) positions of all cells occupied by this tetromino.
+        
+        The cells come back as a frozenset so membership tests are hashed
+        lookups; use ``iter_cells`` to walk them in shape order.
+        """
+        return frozenset(self.iter_cells())
+    
+    def iter_cells(self) -> Iterator[Tuple[int, int]]:
+        """Yield the (row, col) of every cell occupied by this tetromino."""
+        row, col = self.position
+        for row_offset, col_offset in _SHAPES_FLAT[self.type * 4 + self.rotation][0]:
+            yield (row + row_offset, col + col_offset)
 
 
-@dataclass(frozen=True)
+@lru_cache(maxsize=8192)
+def _make_tetromino(type: TetrominoType, row: int, col: int, rotation: int) -> Tetromino:
+    """
+    Get the tetromino with the given type, position and rotation.
+    
+    Only a few hundred distinct pieces occur in a game, so moves and rotations
+    reuse interned instances instead of constructing a new one each time.
+    The cache is cleared by GameState.new_game to bound its memory.
+    """
+    return Tetromino(type, (row, col), rotation)
+
+
+def _column_tops(row_masks: Tuple[int, ...], width: int, height: int) -> Tuple[int, ...]:
+    """Get the topmost filled row of each column (``height`` if the column is empty)."""
+    tops = [height] * width
+    remaining = (1 << width) - 1  # Columns whose top hasn't been found yet
+    for row, mask in enumerate(row_masks):
+        found = mask & remaining
+        while found:
+            lowest = found & -found
+            tops[lowest.bit_length() - 1] = row
+            found ^= lowest
+        remaining &= ~mask
+        if not remaining:
+            break
+    return tuple(tops)
+
+
+def _remove_rows(
+    row_masks: Sequence[int],
+    row_colors: Sequence[Tuple[Optional[TetrominoType], ...]],
+    rows: List[int],
+    width: int,
+) -> Tuple[Tuple[int, ...], Tuple[Tuple[Optional[TetrominoType], ...], ...]]:
+    """Remove the given sorted rows, shifting the rows above them down."""
+    # Pad the top with one empty row per removed row, then copy the runs
+    # of surviving rows between the removed ones
+    new_masks = [0] * len(rows)
+    new_colors = [(None,) * width] * len(rows)
+    start = 0
+    for row in rows:
+        new_masks += row_masks[start:row]
+        new_colors += row_colors[start:row]
+        start = row + 1
+    new_masks += row_masks[start:]
+    new_colors += row_colors[start:]
+    return tuple(new_masks), tuple(new_colors)
+
+
+@dataclass(frozen=True, slots=True)
 class Board:
-    """Represents the game board."""
+    """
+    Represents the game board.
+
+    Each row is stored as an int bitmask where bit ``col`` is set when the
+    cell is filled, alongside a parallel tuple holding the tetromino type of
+    every cell (``None`` for empty cells) for rendering. ``column_tops`` holds
+    the topmost filled row of each column (``height`` when empty) and is
+    derived from the row masks when the board is built.
+    
+    Boards are frozen and hashable so they can key caches such as
+    ``check_game_over_cached``. Only the row masks are hashed; the colors
+    still take part in equality but hashing them would cost far more than it
+    would spread the hashes.
+    """
     width: int
     height: int
-    cells: Dict[Tuple[int, int], TetrominoType]  # (row, col) -> tetromino type
+    row_masks: Tuple[int, ...]
+    row_colors: Tuple[Tuple[Optional[TetrominoType], ...], ...] = field(hash=False)
+    column_tops: Tuple[int, ...] = field(init=False, compare=False, repr=False)
+    
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "column_tops", _column_tops(self.row_masks, self.width, self.height))
     
     @classmethod
     def create_empty(cls, width: int = 10, height: int = 20) -> 'Board':
-        """Create an empty board with the given dimensions."""
-        return cls(width, height, {})
+        """
+        Create an empty board with the given dimensions.
+        
+        Boards are frozen, so the same empty board is returned for every call
+        with the same size, however the size is passed.
+        """
+        return _empty_board(cls, width, height)
     
-    def is_valid_position(self, position: Position) -> bool:
+    @classmethod
+    def from_cells(cls, width: int, height: int,
+                   cells: Mapping[Tuple[int, int], TetrominoType]) -> 'Board':
+        """Create a board from a (row, col) -> tetromino type mapping."""
+        masks = [0] * height
+        colors = [[None] * width for _ in range(height)]
+        for (row, col), tetromino_type in cells.items():
+            masks[row] |= 1 << col
+            colors[row][col] = tetromino_type
+        return cls(width, height, tuple(masks), tuple(tuple(row) for row in colors))
+    
+    @property
+    def cells(self) -> Dict[Tuple[int, int], TetrominoType]:
+        """The filled cells as a (row, col) -> tetromino type mapping."""
+        return {
+            (row, col): tetromino_type
+            for row, colors in enumerate(self.row_colors)
+            for col, tetromino_type in enumerate(colors)
+            if tetromino_type is not None
+        }
+    
+    def is_valid_position(self, row: int, col: int) -> bool:
         """Check if a position is valid (within bounds and not occupied)."""
         return (
-            0 <= position.row < self.height and
-            0 <= position.col < self.width and
-            (position.row, position.col) not in self.cells
+            0 <= row < self.height and
+            0 <= col < self.width and
+            not (self.row_masks[row] >> col) & 1
         )
     
     def is_valid_tetromino(self, tetromino: Tetromino) -> bool:
         """Check if a tetromino is in a valid position."""
-        return all(self.is_valid_position(cell) for cell in tetromino.get_cells())
+        row, col = tetromino.position
+        _, min_row, max_row, min_col, max_col, packed = _SHAPES_FLAT[
+            tetromino.type * 4 + tetromino.rotation
+        ]
+        
+        # Bounds check the whole piece at once using its precomputed extents
+        if not (
+            0 <= row + min_row and row + max_row < self.height and
+            0 <= col + min_col and col + max_col < self.width
+        ):
+            return False
+        
+        # Test each row the piece covers at once, stopping at the first overlap
+        row_masks = self.row_masks
+        shift = col + min_col
+        for row_offset, mask in packed:
+            if row_masks[row + row_offset] & (mask << shift):
+                return False
+        return True
+    
+    def _placed_rows(
+        self, tetromino: Tetromino,
+    ) -> Tuple[List[int], List[Tuple[Optional[TetrominoType], ...]]]:
+        """
+        Get the row masks and row colors with the tetromino placed.
+        
+        Cells above the top of the board (a piece locked before it fully
+        entered) are left out rather than wrapping around to the bottom rows.
+        """
+        new_masks = list(self.row_masks)
+        new_colors = list(self.row_colors)
+        for row, col in tetromino.iter_cells():
+            if row < 0:
+                continue
+            new_masks[row] |= 1 << col
+            row_colors = list(new_colors[row])
+            row_colors[col] = tetromino.type
+            new_colors[row] = tuple(row_colors)
+        return new_masks, new_colors
+    
+    def fill_row(self, row: int, tetromino_type: TetrominoType) -> 'Board':
+        """Return a new board with every cell of a row filled with one tetromino type."""
+        new_masks = list(self.row_masks)
+        new_masks[row] = (1 << self.width) - 1
+        new_colors = list(self.row_colors)
+        new_colors[row] = (tetromino_type,) * self.width
+        return Board(self.width, self.height, tuple(new_masks), tuple(new_colors))
     
     def place_tetromino(self, tetromino: Tetromino) -> 'Board':
         """Return a new board with the tetromino placed."""
-        new_cells = dict(self.cells)
-        for cell in tetromino.get_cells():
-            new_cells[(cell.row, cell.col)] = tetromino.type
-        return Board(self.width, self.height, new_cells)
-    
-    def clear_lines(self) -> Tuple['Board', int]:
-        """Clear completed lines and return the new board and number of lines cleared."""
-        # Find completed lines
-        completed_lines = []
-        for row in range(self.height):
-            if all((row, col) in self.cells for col in range(self.width)):
-                completed_lines.append(row)
+        new_masks, new_colors = self._placed_rows(tetromino)
+        return Board(self.width, self.height, tuple(new_masks), tuple(new_colors))
+    
+    def lock_tetromino(self, tetromino: Tetromino) -> Tuple['Board', int]:
+        """
+        Place a tetromino and clear the lines it completes.
+        
+        Gives the same result as ``place_tetromino`` followed by ``clear_lines``
+        on the piece's rows, but builds only the final board.
+        """
+        new_masks, new_colors = self._placed_rows(tetromino)
+        
+        # Only the rows the piece covers can have become complete
+        full = (1 << self.width) - 1
+        row = tetromino.position[0]
+        packed = _SHAPES_FLAT[tetromino.type * 4 + tetromino.rotation][5]
+        completed_lines = [
+            row + row_offset for row_offset, _ in packed
+            if row + row_offset >= 0 and new_masks[row + row_offset] == full
+        ]
         
         if not completed_lines:
-            return self, 0
+            return Board(self.width, self.height, tuple(new_masks), tuple(new_colors)), 0
         
-        # Create new cells dictionary with lines removed and cells shifted
-        new_cells = {}
+        new_masks, new_colors = _remove_rows(new_masks, new_colors, completed_lines, self.width)
+        return Board(self.width, self.height, new_masks, new_colors), len(completed_lines)
+    
+    def clear_lines(self, touched_rows: Optional[Iterable[int]] = None) -> Tuple['Board', int]:
+        """
+        Clear completed lines and return the new board and number of lines cleared.
         
-        # For each cell in the original board
-        for (row, col), tetromino_type in self.cells.items():
-            # Skip cells in completed lines
-            if row in completed_lines:
-                continue
-            
-            # Count how many spaces the row needs to move down
-            # This is the number of completed lines
-            spaces_down = len([line for line in completed_lines if line > row])
-            
-            new_row = row + spaces_down
-            new_cells[(new_row, col)] = tetromino_type
+        Args:
+            touched_rows: Rows that changed since the last clear (e.g. the rows of
+                the piece that just locked). Only these can have become complete,
+                so only they are checked; rows off the board are ignored.
+                Defaults to checking every row.
+        """
+        full = (1 << self.width) - 1
+        if touched_rows is None:
+            rows = range(self.height)
+        else:
+            rows = {row for row in touched_rows if 0 <= row < self.height}
+        completed_lines = sorted(row for row in rows if self.row_masks[row] == full)
         
-        return Board(self.width, self.height, new_cells), len(completed_lines)
+        if not completed_lines:
+            return self, 0
+        
+        new_masks, new_colors = _remove_rows(self.row_masks, self.row_colors, completed_lines, self.width)
+        
+        return Board(self.width, self.height, new_masks, new_colors), len(completed_lines)
+
+
+@lru_cache(maxsize=8)
+def _empty_board(cls: type, width: int, height: int) -> Board:
+    """Build the empty board of a size, keyed on positional arguments only."""
+    return cls(width, height, (0,) * height, ((None,) * width,) * height)
+
+
+_ALL_TYPES = tuple(TetrominoType)
+
+
+@dataclass(slots=True)
+class PieceBag:
+    """
+    The standard 7-bag randomizer (mutated in place).
+    
+    Every piece type is dealt once per bag of 7, in an order shuffled with
+    ``rng``. Each game owns its bag, so games never draw from one another's.
+    """
+    rng: random.Random = field(default_factory=random.Random)
+    types: Deque[TetrominoType] = field(default_factory=deque)
+    
+    def draw(self) -> TetrominoType:
+        """Take the next piece type, shuffling a new bag when this one is empty."""
+        if not self.types:
+            bag = list(_ALL_TYPES)
+            self.rng.shuffle(bag)
+            self.types.extend(bag)
+        return self.types.popleft()
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True)
 class GameState:
-    """Represents the current state of the game."""
+    """Represents the current state of the game (mutated in place)."""
     board: Board
     current_piece: Optional[Tetromino]
     next_piece: Optional[Tetromino]
@@ -205,10 +484,19 @@ class GameState:
     level: int
     lines_cleared: int
     game_over: bool
+    bag: PieceBag = field(default_factory=PieceBag, compare=False, repr=False)
     
     @classmethod
-    def new_game(cls, board_width: int = 10, board_height: int = 20) -> 'GameState':
-        """Create a new game state."""
+    def new_game(cls, board_width: int = 10, board_height: int = 20,
+                 rng: Optional[random.Random] = None) -> 'GameState':
+        """
+        Create a new game state.
+        
+        Args:
+            rng: Random source for the game's piece bag. Defaults to a new,
+                randomly seeded one.
+        """
+        _make_tetromino.cache_clear()
         return cls(
             board=Board.create_empty(board_width, board_height),
             current_piece=None,
@@ -217,48 +505,84 @@ class GameState:
             score=0,
             level=1,
             lines_cleared=0,
-            game_over=False
+            game_over=False,
+            bag=PieceBag() if rng is None else PieceBag(rng),
         )
 
 
 # Game engine functions
-def create_tetromino(type: TetrominoType, position: Position) -> Tetromino:
+def create_tetromino(type: TetrominoType, position: Tuple[int, int]) -> Tetromino:
     """Create a new tetromino of the given type at the given position."""
     return Tetromino(type, position)
 
 
+@lru_cache(maxsize=None)
+def _spawn_masks(width: int, height: int) -> Tuple[Optional[Tuple[Tuple[int, int], ...]], ...]:
+    """
+    Get the board cells each piece type needs free to spawn, indexed by type.
+    
+    Each entry is a tuple of (row, mask) pairs to AND with the board's row
+    masks, or None if the piece does not fit within a board this size.
+    """
+    spawn_col = width // 2
+    spawn_masks = []
+    for tetromino_type in TetrominoType:
+        if tetromino_type == TetrominoType.O:
+            # O tetromino extends up and left from its position, so the
+            # 4 cells needed for it are checked in the top-left corner
+            masks = ((0, 0b11), (1, 0b11))
+        else:
+            # Other tetrominos start at the top center
+            _, _, _, min_col, max_col, packed = _SHAPES_FLAT[tetromino_type * 4]
+            if spawn_col + min_col < 0 or spawn_col + max_col >= width:
+                spawn_masks.append(None)
+                continue
+            masks = tuple(
+                (1 + row_offset, mask << (spawn_col + min_col)) for row_offset, mask in packed
+            )
+        
+        # A piece that reaches below the bottom of a short board can't spawn either
+        spawn_masks.append(None if any(row >= height for row, _ in masks) else masks)
+    return tuple(spawn_masks)
+
+
 def check_game_over(board: Board, next_piece_type: TetrominoType) -> bool:
     """Check if the game is over by trying to place a new piece at the starting position."""
-    # For O tetromino, adjust the starting position to account for its shape
-    if next_piece_type == TetrominoType.O:
-        # O tetromino extends up and left from its position
-        # Check if any of the 4 cells needed for the O tetromino are occupied
-        if (0, 0) in board.cells or (0, 1) in board.cells or (1, 0) in board.cells or (1, 1) in board.cells:
-            return True
-        return False
-    else:
-        # Other tetrominos start at the top center
-        start_position = Position(1, board.width // 2)
-        new_piece = Tetromino(next_piece_type, start_position)
-        
-        # If the new piece can't be placed, the game is over
-        return not board.is_valid_tetromino(new_piece)
+    spawn_masks = _spawn_masks(board.width, board.height)[next_piece_type]
+    if spawn_masks is None:
+        return True
+    
+    # If any of the cells the new piece needs are occupied, the game is over
+    row_masks = board.row_masks
+    return any(row_masks[row] & mask for row, mask in spawn_masks)
+
+
+# check_game_over memoized on the board and piece type, for callers such as a
+# search that meet the same board many times
+check_game_over_cached = lru_cache(maxsize=4096)(check_game_over)
+
+
+# Bag for callers of generate_next_piece that don't have a game of their own
+_DEFAULT_BAG = PieceBag()
 
 
-def generate_next_piece(board: Board) -> Tetromino:
-    """Generate a new random tetromino at the top of the board."""
-    import random
+def generate_next_piece(board: Board, bag: Optional[PieceBag] = None) -> Tetromino:
+    """
+    Generate a new random tetromino at the top of the board.
     
-    # Choose a random tetromino type
-    tetromino_type = random.choice(list(TetrominoType))
+    Args:
+        bag: The bag to draw the piece type from, normally the game's own.
+            Defaults to a bag shared by every caller that doesn't pass one.
+    """
+    tetromino_type = (_DEFAULT_BAG if bag is None else bag).draw()
     
     # For O tetromino, adjust the starting position to account for its shape
     if tetromino_type == TetrominoType.O:
         # O tetromino extends up and left from its position
-        start_position = Position(1, board.width // 2 - 1)
+        start_position = (1, board.width // 2 - 1)
     else:
         # Other tetrominos start at the top center
-        start_position = Position(0, board.width // 2)
+        start_position = (0, board.width // 2)
     
     return Tetromino(tetromino_type, start_position)
 
@@ -272,29 +596,12 @@ def update_game(state: GameState) -> GameState:
     if state.current_piece is None:
         # If there's no next piece, generate one
         if state.next_piece is None:
-            next_piece = generate_next_piece(state.board)
-            return GameState(
-                board=state.board,
-                current_piece=next_piece,
-                next_piece=generate_next_piece(state.board),
-                held_piece=state.held_piece,
-                score=state.score,
-                level=state.level,
-                lines_cleared=state.lines_cleared,
-                game_over=state.game_over
-            )
-        
-        # Use the next piece as the current piece
-        return GameState(
-            board=state.board,
-            current_piece=state.next_piece,
-            next_piece=generate_next_piece(state.board),
-            held_piece=state.held_piece,
-            score=state.score,
-            level=state.level,
-            lines_cleared=state.lines_cleared,
-            game_over=state.game_over
-        )
+            state.current_piece = generate_next_piece(state.board, state.bag)
+        else:
+            # Use the next piece as the current piece
+            state.current_piece = state.next_piece
+        state.next_piece = generate_next_piece(state.board, state.bag)
+        return state
     
     # Move the current piece down
     return move_tetromino(state, Direction.DOWN)
@@ -307,42 +614,25 @@ def move_tetromino(state: GameState, direction: Direction) -> GameState:
     
     new_piece = state.current_piece.move(direction)
     if state.board.is_valid_tetromino(new_piece):
-        return GameState(
-            board=state.board,
-            current_piece=new_piece,
-            next_piece=state.next_piece,
-            held_piece=state.held_piece,
-            score=state.score,
-            level=state.level,
-            lines_cleared=state.lines_cleared,
-            game_over=state.game_over
-        )
+        state.current_piece = new_piece
+        return state
     
     # If moving down and invalid, place the piece
     if direction == Direction.DOWN:
-        new_board = state.board.place_tetromino(state.current_piece)
-        new_board, lines_cleared = new_board.clear_lines()
+        new_board, lines_cleared = state.board.lock_tetromino(state.current_piece)
         
-        # Update score, level, etc.
-        new_score = state.score + calculate_score(lines_cleared, state.level)
-        new_lines_cleared = state.lines_cleared + lines_cleared
-        new_level = calculate_level(new_lines_cleared)
+        # Update score, level, etc. (only clears can change them)
+        if lines_cleared:
+            state.score += calculate_score(lines_cleared, state.level)
+            state.lines_cleared += lines_cleared
+            state.level = calculate_level(state.lines_cleared)
         
         # Check for game over if we need to spawn a new piece
-        game_over = False
         if state.next_piece is not None:
-            game_over = check_game_over(new_board, state.next_piece.type)
+            state.game_over = check_game_over(new_board, state.next_piece.type)
         
-        return GameState(
-            board=new_board,
-            current_piece=None,  # Will be replaced with next piece
-            next_piece=state.next_piece,
-            held_piece=state.held_piece,
-            score=new_score,
-            level=new_level,
-            lines_cleared=new_lines_cleared,
-            game_over=game_over
-        )
+        state.board = new_board
+        state.current_piece = None  # Will be replaced with next piece
     
     return state
 
@@ -354,47 +644,53 @@ def rotate_tetromino(state: GameState, rotation: Rotation) -> GameState:
     
     new_piece = state.current_piece.rotate(rotation)
     if state.board.is_valid_tetromino(new_piece):
-        return GameState(
-            board=state.board,
-            current_piece=new_piece,
-            next_piece=state.next_piece,
-            held_piece=state.held_piece,
-            score=state.score,
-            level=state.level,
-            lines_cleared=state.lines_cleared,
-            game_over=state.game_over
-        )
+        state.current_piece = new_piece
     
     return state
 
 
 def hard_drop(state: GameState) -> GameState:
-    """Drop the current tetromino to the bottom."""
+    """Drop the current tetromino to the bottom and lock it."""
     if state.current_piece is None:
         return state
     
-    # Keep moving down until invalid
-    current_state = state
-    while True:
-        new_state = move_tetromino(current_state, Direction.DOWN)
-        if new_state.current_piece == current_state.current_piece:
-            break
-        current_state = new_state
+    board = state.board
+    piece = state.current_piece
+    row, col = piece.position
+    
+    # Distance the piece can fall before its lowest cell in some column
+    # reaches the top of that column
+    tops = board.column_tops
+    drop = min(
+        tops[col + col_offset] - 1 - (row + row_offset)
+        for row_offset, col_offset in _PIECE_BOTTOMS[piece.type * 4 + piece.rotation]
+    )
     
-    return current_state
+    if drop >= 0:
+        # Every cell is above its column's top, so the path down is clear and
+        # the piece lands exactly where the nearest cell meets its column
+        piece = _make_tetromino(piece.type, row + drop, col, piece.rotation)
+    else:
+        # The piece is tucked under an overhang, so step it down row by row
+        dropped = piece.move(Direction.DOWN)
+        while board.is_valid_tetromino(dropped):
+            piece = dropped
+            dropped = piece.move(Direction.DOWN)
+    state.current_piece = piece
+    
+    # Lock the piece in place
+    return move_tetromino(state, Direction.DOWN)
+
+
+# Standard Tetris scoring: points per level for clearing 0 to 4 lines at once
+_LINE_POINTS = (0, 100, 300, 500, 800)
+
 
 def calculate_score(lines_cleared: int, level: int) -> int:
-    """Calculate the score for clearing lines."""
-    # Standard Tetris scoring
-    if lines_cleared == 1:
-        return 100 * level
-    elif lines_cleared == 2:
-        return 300 * level
-    elif lines_cleared == 3:
-        return 500 * level
-    elif lines_cleared == 4:
-        return 800 * level
-    return 0
+    """Calculate the score for clearing lines (0 for counts the table doesn't cover)."""
+    if not 0 <= lines_cleared < len(_LINE_POINTS):
+        return 0
+    return _LINE_POINTS[lines_cleared] * level
 
 
 def calculate_level(lines_cleared: int) -> int:
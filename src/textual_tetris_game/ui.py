@@ -6,24 +6,36 @@ It uses the Textual framework to create a rich terminal user interface.
 """
 
 import asyncio
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Callable, Optional, Tuple
 
+from textual import work
 from textual.app import App, ComposeResult
 from textual.binding import Binding
 from textual.containers import Container, Horizontal, Vertical, Center
 from textual.css.query import NoMatches
 from textual.reactive import reactive
 from textual.screen import Screen
+from textual.timer import Timer
 from textual.widgets import Button, Footer, Header, Label, Static
-from textual.worker import Worker, WorkerState
 
 from textual_tetris_game.game import (
     Board, Direction, GameState, Rotation, TetrominoType,
-    TETROMINO_SHAPES, hard_drop,  move_tetromino, 
-    rotate_tetromino, update_game
+    hard_drop,  move_tetromino, rotate_tetromino, shape_offsets, update_game
 )
 
 
+# Markup for a single two-character board cell
+_EMPTY_CELL = "  "
+_FILLED_CELL = "[on green]  [/on green]"
+
+
+@lru_cache(maxsize=None)
+def _board_borders(width: int) -> Tuple[str, str]:
+    """Get the top and bottom border lines for a board of the given width."""
+    return "┌" + "─" * (width * 2) + "┐\n", "└" + "─" * (width * 2) + "┘"
+
+
 class BoardWidget(Static):
     """Widget that displays the Tetris game board."""
     
@@ -39,34 +51,48 @@ class BoardWidget(Static):
     board_state = reactive(None)
     current_piece = reactive(None)
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The (board, piece) last rendered and the resulting string
+        self._cache_key: Optional[Tuple] = None
+        self._cache_val = ""
+    
     def render(self) -> str:
         """Render the game board."""
         if self.board_state is None:
             return "Loading..."
         
-        # Create a 2D grid representation of the board
-        grid = [["  " for _ in range(self.board_state.width)] for _ in range(self.board_state.height)]
+        # Boards and pieces are immutable, so the same objects render the same
+        key = self._cache_key
+        if key is not None and key[0] is self.board_state and key[1] is self.current_piece:
+            return self._cache_val
         
-        # Fill in the cells from the board state
-        for (row, col), tetromino_type in self.board_state.cells.items():
-            if 0 <= row < self.board_state.height and 0 <= col < self.board_state.width:
-                grid[row][col] = f"[on green]  [/on green]"
+        self._cache_key = (self.board_state, self.current_piece)
+        self._cache_val = self._render_board()
+        return self._cache_val
+    
+    def _render_board(self) -> str:
+        """Build the board string for the current board and piece."""
+        board = self.board_state
+        width = board.width
         
-        # Add the current piece to the grid
+        # Overlay the current piece onto a copy of the row masks
+        masks = list(board.row_masks)
         if self.current_piece is not None:
-            for cell in self.current_piece.get_cells():
-                if 0 <= cell.row < self.board_state.height and 0 <= cell.col < self.board_state.width:
-                    grid[cell.row][cell.col] = f"[on green]  [/on green]"
-        
-        # Construct the board string with borders
-        board_str = "┌" + "─" * (self.board_state.width * 2) + "┐\n"
+            for row, col in self.current_piece.iter_cells():
+                if 0 <= row < board.height and 0 <= col < width:
+                    masks[row] |= 1 << col
         
-        for row in grid:
-            board_str += "│" + "".join(cell for cell in row) + "│\n"
+        # Build the board string with borders in a single join
+        top, bottom = _board_borders(width)
+        parts = [top]
+        for mask in masks:
+            parts.append("│")
+            parts.extend(_FILLED_CELL if (mask >> col) & 1 else _EMPTY_CELL for col in range(width))
+            parts.append("│\n")
+        parts.append(bottom)
         
-        board_str += "└" + "─" * (self.board_state.width * 2) + "┘"
-        
-        return board_str
+        return "".join(parts)
 
 
 class NextPieceWidget(Static):
@@ -82,18 +108,34 @@ class NextPieceWidget(Static):
     """
     
     next_piece = reactive(None)
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The piece type last rendered and the resulting string
+        self._cache_key: Optional[TetrominoType] = None
+        self._cache_val = ""
 
     def render(self) -> str:
         """Render the next piece."""
         if self.next_piece is None:
             return "Next:\n\nNone"
         
+        # The preview only depends on the piece type
+        if self.next_piece.type == self._cache_key:
+            return self._cache_val
+        
+        self._cache_key = self.next_piece.type
+        self._cache_val = self._render_preview()
+        return self._cache_val
+    
+    def _render_preview(self) -> str:
+        """Build the preview string for the next piece."""
         # Create a small grid to display the next piece
-        grid = [["  " for _ in range(4)] for _ in range(2)]
+        grid = [[_EMPTY_CELL for _ in range(4)] for _ in range(2)]
         
         # Get the shape of the next piece at rotation 0
         tetromino_type = self.next_piece.type
-        shape = TETROMINO_SHAPES[tetromino_type][0]
+        shape = shape_offsets(tetromino_type)
         
         # Calculate the center position for the preview
         center_row, center_col = 1, 1
@@ -105,7 +147,7 @@ class NextPieceWidget(Static):
             row = center_row + row_offset
             col = center_col + col_offset
             if 0 <= row < 2 and 0 <= col < 4:
-                grid[row][col] = f"[on green]  [/on green]"
+                grid[row][col] = _FILLED_CELL
         
         # Construct the preview string
         preview_str = "Next:\n\n"
@@ -129,9 +171,19 @@ class ScoreWidget(Static):
     level = reactive(1)
     lines_cleared = reactive(0)
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The (score, level, lines) last rendered and the resulting string
+        self._cache_key: Optional[Tuple[int, int, int]] = None
+        self._cache_val = ""
+    
     def render(self) -> str:
         """Render the score and level."""
-        return f"Score: {self.score}\n\nLevel: {self.level}\n\nLines: {self.lines_cleared}"
+        key = (self.score, self.level, self.lines_cleared)
+        if key != self._cache_key:
+            self._cache_key = key
+            self._cache_val = f"Score: {self.score}\n\nLevel: {self.level}\n\nLines: {self.lines_cleared}"
+        return self._cache_val
 
 
 class ControlsWidget(Static):
@@ -196,14 +248,18 @@ class GameScreen(Screen):
         Binding("space", "hard_drop", "Hard Drop"),
         Binding("p", "toggle_pause", "Pause/Resume"),
     ]
-    game_state = reactive(GameState.new_game())
+    game_state = reactive(GameState.new_game)
     paused = reactive(False)
     
     def watch_paused(self, paused: bool) -> None:
         """Watch for changes to the paused state."""
         if paused:
+            if self._timer is not None:
+                self._timer.pause()
             self.mount(PauseOverlay())
         else:
+            if self._timer is not None:
+                self._timer.resume()
             try:
                 self.query_one(PauseOverlay).remove()
             except NoMatches:
@@ -211,7 +267,23 @@ class GameScreen(Screen):
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.game_worker = None
+        # The interval timer driving the game and the level it was set up for
+        self._timer: Optional[Timer] = None
+        self._timer_level = 0
+        
+        # What the widgets currently show, so unchanged values can be skipped.
+        # Boards and pieces are immutable, so an identity check is enough.
+        self._shown_board = None
+        self._shown_piece = None
+        self._shown_next_piece = None
+        self._shown_score = None
+        
+        # Set when the game state changed since the widgets were last updated
+        self._dirty = False
+        
+        # Pending game steps and inputs as (function, args) pairs, applied in
+        # order by the input worker so it is the only writer of the game state
+        self._input_queue: asyncio.Queue[Tuple[Callable[..., Any], tuple]] = asyncio.Queue()
     
     def compose(self) -> ComposeResult:
         """Compose the game screen layout."""
@@ -227,49 +299,88 @@ class GameScreen(Screen):
     def on_mount(self) -> None:
         """Called when the screen is mounted."""
         # Initialize the game state with a new piece
-        self.game_state = update_game(self.game_state)
+        update_game(self.game_state)
+        self.mutate_reactive(GameScreen.game_state)
         self.update_ui()
         
-        # Start the game worker to handle automatic piece movement
-        self.start_game_worker()
-    
-    def start_game_worker(self) -> None:
-        """Start the game loop in a worker."""
-        if self.game_worker is None or self.game_worker.state == WorkerState.ERROR:
-            self.run_worker(self.game_loop())
+        # Start applying inputs, and the timer to handle automatic piece movement
+        self._input_loop()
+        self.start_game_timer()
+    
+    def start_game_timer(self) -> None:
+        """Start (or restart) the game timer at the speed for the current level."""
+        if self._timer is not None:
+            self._timer.stop()
+        self._timer_level = self.game_state.level
+        self._timer = self.set_interval(self.get_delay_for_level(), self._tick, pause=self.paused)
+    
+    def watch_game_state(self, game_state: GameState) -> None:
+        """Watch for changes to the game state."""
+        # Control game speed based on level
+        if self._timer is not None and game_state.level != self._timer_level:
+            self.start_game_timer()
+    
+    def _tick(self) -> None:
+        """Advance the game by one step."""
+        self.queue_input(update_game)
+    
+    def queue_input(self, func: Callable[..., Any], *args: Any) -> None:
+        """Queue an engine function to be applied to the game state as ``func(state, *args)``."""
+        if not self.paused and not self.game_state.game_over:
+            self._input_queue.put_nowait((func, args))
     
-    async def game_loop(self) -> None:
-        """Game loop that updates the game state."""
+    @work(exclusive=True, group="input")
+    async def _input_loop(self) -> None:
+        """Apply queued inputs to the game state as they arrive."""
+        queue = self._input_queue
         while True:
-            if not self.paused and not self.game_state.game_over:
-                # Update game state
-                self.game_state = update_game(self.game_state)
-                
-                # Update UI
-                self.update_ui()
+            changed = self._apply_input(*await queue.get())
+            
+            # Apply the rest of a burst of inputs before updating the UI
+            while not queue.empty():
+                changed = self._apply_input(*queue.get_nowait()) or changed
             
-            # Control game speed based on level
-            await asyncio.sleep(self.get_delay_for_level())
+            if changed:
+                self.mutate_reactive(GameScreen.game_state)
+                self.mark_dirty()
+    
+    def _apply_input(self, func: Callable[..., Any], args: tuple) -> bool:
+        """Apply a queued input, returning whether it was applied."""
+        # The game may have been paused or ended since the input was queued
+        if self.paused or self.game_state.game_over:
+            return False
+        func(self.game_state, *args)
+        return True
     
     def get_delay_for_level(self) -> float:
         """Get the delay between game updates based on the current level."""
         # Standard Tetris speed formula
         return max(0.1, 1.0 - (self.game_state.level - 1) * 0.05)
     
+    def mark_dirty(self) -> None:
+        """
+        Schedule a UI update for the current frame.
+        
+        Key autorepeat can deliver several moves between refreshes, so the
+        widgets are updated once after the pending events have been handled
+        rather than once per move.
+        """
+        if not self._dirty:
+            self._dirty = True
+            self.call_after_refresh(self._flush_ui)
+    
+    def _flush_ui(self) -> None:
+        """Update the UI if the game state changed since the last update."""
+        if self._dirty:
+            self._dirty = False
+            self.update_ui()
+    
     def update_ui(self) -> None:
         """Update the UI with the current game state."""
         try:
-            board_widget = self.query_one(BoardWidget)
-            board_widget.board_state = self.game_state.board
-            board_widget.current_piece = self.game_state.current_piece
-            
-            next_piece_widget = self.query_one(NextPieceWidget)
-            next_piece_widget.next_piece = self.game_state.next_piece
-            
-            score_widget = self.query_one(ScoreWidget)
-            score_widget.score = self.game_state.score
-            score_widget.level = self.game_state.level
-            score_widget.lines_cleared = self.game_state.lines_cleared
+            self._update_board_ui()
+            self._update_next_piece_ui()
+            self._update_score_ui()
             
             # Check for game over
             if self.game_state.game_over:
@@ -278,45 +389,68 @@ class GameScreen(Screen):
             # Widgets not mounted yet
             pass
     
+    def _update_board_ui(self) -> None:
+        """Update the board widget if the board or current piece changed."""
+        board = self.game_state.board
+        current_piece = self.game_state.current_piece
+        if board is self._shown_board and current_piece is self._shown_piece:
+            return
+        
+        board_widget = self.query_one(BoardWidget)
+        board_widget.board_state = board
+        board_widget.current_piece = current_piece
+        self._shown_board = board
+        self._shown_piece = current_piece
+    
+    def _update_next_piece_ui(self) -> None:
+        """Update the next piece widget if the next piece changed."""
+        next_piece = self.game_state.next_piece
+        if next_piece is self._shown_next_piece:
+            return
+        
+        self.query_one(NextPieceWidget).next_piece = next_piece
+        self._shown_next_piece = next_piece
+    
+    def _update_score_ui(self) -> None:
+        """Update the score widget if the score, level or lines changed."""
+        state = self.game_state
+        score = (state.score, state.level, state.lines_cleared)
+        if score == self._shown_score:
+            return
+        
+        score_widget = self.query_one(ScoreWidget)
+        score_widget.score, score_widget.level, score_widget.lines_cleared = score
+        self._shown_score = score
+    
     def handle_game_over(self) -> None:
         """Handle game over state."""
-        # Stop the game worker
-        if self.game_worker is not None:
-            self.game_worker.stop()
-            self.game_worker = None
+        # Stop the game timer
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
         
         # Show the game over screen
         self.app.show_game_over(self.game_state.score)
     
     def action_move_left(self) -> None:
         """Move the current piece left."""
-        if not self.paused and not self.game_state.game_over:
-            self.game_state = move_tetromino(self.game_state, Direction.LEFT)
-            self.update_ui()
+        self.queue_input(move_tetromino, Direction.LEFT)
     
     def action_move_right(self) -> None:
         """Move the current piece right."""
-        if not self.paused and not self.game_state.game_over:
-            self.game_state = move_tetromino(self.game_state, Direction.RIGHT)
-            self.update_ui()
+        self.queue_input(move_tetromino, Direction.RIGHT)
     
     def action_soft_drop(self) -> None:
         """Soft drop the current piece."""
-        if not self.paused and not self.game_state.game_over:
-            self.game_state = move_tetromino(self.game_state, Direction.DOWN)
-            self.update_ui()
+        self.queue_input(move_tetromino, Direction.DOWN)
     
     def action_rotate(self) -> None:
         """Rotate the current piece."""
-        if not self.paused and not self.game_state.game_over:
-            self.game_state = rotate_tetromino(self.game_state, Rotation.CLOCKWISE)
-            self.update_ui()
+        self.queue_input(rotate_tetromino, Rotation.CLOCKWISE)
     
     def action_hard_drop(self) -> None:
         """Hard drop the current piece."""
-        if not self.paused and not self.game_state.game_over:
-            self.game_state = hard_drop(self.game_state)
-            self.update_ui()
+        self.queue_input(hard_drop)
     
     def action_toggle_pause(self) -> None:
         """Pause or resume the game."""
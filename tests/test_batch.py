@@ -0,0 +1,106 @@
+"""
+Tests for the Textual Tetris Game batched game steps.
+
+This module checks batched steps against the single-game engine functions.
+"""
+
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from textual_tetris_game._batch import DOWN, LEFT, RIGHT, ROTATE, BatchState
+from textual_tetris_game.game import (
+    Board, Direction, GameState, Rotation, Tetromino, TetrominoType,
+    move_tetromino, rotate_tetromino, update_game
+)
+
+
+def _apply(state: GameState, action: int) -> None:
+    """Apply a batch action code to a single game with the engine functions."""
+    if action == ROTATE:
+        rotate_tetromino(state, Rotation.CLOCKWISE)
+    else:
+        move_tetromino(state, Direction(action))
+
+
+def test_step_matches_engine():
+    """Test that stepping a batch of games matches stepping each game on its own."""
+    rng = random.Random(3)
+    states = [GameState.new_game(rng=random.Random(seed)) for seed in range(16)]
+    for state in states:
+        update_game(state)
+    batch = BatchState.from_states(states)
+    
+    for _ in range(2000):
+        if all(state.game_over for state in states):
+            break
+        actions = np.array([rng.choice([LEFT, RIGHT, DOWN, DOWN, DOWN, ROTATE]) for _ in states])
+        locked, lines_cleared = batch.step(actions)
+        
+        for index, (state, action) in enumerate(zip(states, actions)):
+            # A finished game isn't stepped any further, so its batch row is ignored
+            if state.game_over:
+                continue
+            
+            lines_before = state.lines_cleared
+            _apply(state, int(action))
+            assert locked[index] == (state.current_piece is None)
+            assert lines_cleared[index] == state.lines_cleared - lines_before
+            assert tuple(batch.row_masks[index]) == state.board.row_masks
+            
+            # Spawn the next piece of every game that locked without ending
+            if state.current_piece is None:
+                if state.game_over:
+                    continue
+                update_game(state)
+                batch.piece_type[index] = state.current_piece.type
+                batch.piece_rotation[index] = state.current_piece.rotation
+                batch.piece_row[index], batch.piece_col[index] = state.current_piece.position
+            
+            assert (batch.piece_row[index], batch.piece_col[index]) == state.current_piece.position
+            assert batch.piece_rotation[index] == state.current_piece.rotation
+    
+    assert all(state.game_over for state in states)
+
+
+def test_step_clears_lines():
+    """Test that a batched lock clears completed lines the same way the engine does."""
+    # Rows 18 and 19 are full apart from column 0. A vertical I fills the gap
+    # and clears both, while a flat I locks on top of them.
+    cells = {(row, col): TetrominoType.J for row in (18, 19) for col in range(1, 10)}
+    pieces = [Tetromino(TetrominoType.I, (17, 0), 1), Tetromino(TetrominoType.I, (17, 1), 0)]
+    states = []
+    for piece in pieces:
+        state = GameState.new_game()
+        state.board = Board.from_cells(10, 20, cells)
+        state.current_piece = piece
+        state.next_piece = Tetromino(TetrominoType.T, (0, 5))
+        states.append(state)
+    batch = BatchState.from_states(states)
+    
+    locked, lines_cleared = batch.step(np.array([DOWN, DOWN]))
+    for state in states:
+        move_tetromino(state, Direction.DOWN)
+    
+    assert list(locked) == [True, True]
+    assert list(lines_cleared) == [2, 0]
+    for index, state in enumerate(states):
+        assert tuple(batch.row_masks[index]) == state.board.row_masks
+
+
+def test_step_locks_above_top():
+    """Test that a piece locked partly above the board leaves the bottom rows alone."""
+    state = GameState.new_game()
+    state.board = Board.from_cells(10, 20, {(1, col): TetrominoType.J for col in range(4, 7)})
+    state.current_piece = Tetromino(TetrominoType.T, (0, 5))
+    state.next_piece = Tetromino(TetrominoType.T, (0, 5))
+    batch = BatchState.from_states([state])
+    
+    locked, _ = batch.step(np.array([DOWN]))
+    move_tetromino(state, Direction.DOWN)
+    
+    assert locked[0] and state.game_over
+    assert batch.row_masks[0, -1] == 0
+    assert tuple(batch.row_masks[0]) == state.board.row_masks
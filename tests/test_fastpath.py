@@ -0,0 +1,63 @@
+"""
+Tests for the Textual Tetris Game compiled fast path.
+
+This module checks the fast path kernels against the Board methods. They
+run compiled when Numba is installed and as plain Python otherwise.
+"""
+
+import pytest
+
+from textual_tetris_game._fastpath import hard_drop_row, is_valid_tetromino, landing_rows
+from textual_tetris_game.game import Board, Direction, Tetromino, TetrominoType
+
+
+def _make_board() -> Board:
+    """Create a board with a ledge over columns 3-6 and a partial floor."""
+    cells = {(10, col): TetrominoType.J for col in range(3, 7)}
+    cells.update({(19, col): TetrominoType.I for col in range(0, 5)})
+    return Board.from_cells(10, 20, cells)
+
+
+def test_is_valid_tetromino_matches_board():
+    """Test that the fast path validity check agrees with Board."""
+    board = _make_board()
+    for tetromino_type in TetrominoType:
+        for rotation in range(4):
+            for row in range(-1, 21):
+                for col in range(-1, 11):
+                    tetromino = Tetromino(tetromino_type, (row, col), rotation)
+                    assert is_valid_tetromino(board, tetromino) == board.is_valid_tetromino(tetromino)
+
+
+@pytest.mark.parametrize("row, col, rotation, expected_row", [
+    (0, 5, 0, 9),    # Lands on the ledge
+    (12, 4, 0, 18),  # Tucked under the ledge, lands on the partial floor
+    (1, 0, 1, 16),   # Vertical, lands on the partial floor
+    (1, 8, 1, 17),   # Vertical, lands on the empty floor
+])
+def test_hard_drop_row(row, col, rotation, expected_row):
+    """Test the fast path hard drop landing row for an I piece."""
+    board = _make_board()
+    tetromino = Tetromino(TetrominoType.I, (row, col), rotation)
+    
+    landed_row = hard_drop_row(board, tetromino)
+    assert landed_row == expected_row
+    
+    landed = Tetromino(tetromino.type, (landed_row, col), rotation)
+    assert board.is_valid_tetromino(landed)
+    assert not board.is_valid_tetromino(landed.move(Direction.DOWN))
+
+
+def test_landing_rows_matches_hard_drop_row():
+    """Test that the batched landing rows agree with dropping one piece at a time."""
+    board = _make_board()
+    for tetromino_type in TetrominoType:
+        for rotation in range(4):
+            rows = landing_rows(board, tetromino_type, rotation, 1)
+            assert len(rows) == board.width
+            for col in range(board.width):
+                tetromino = Tetromino(tetromino_type, (1, col), rotation)
+                if board.is_valid_tetromino(tetromino):
+                    assert rows[col] == hard_drop_row(board, tetromino)
+                else:
+                    assert rows[col] == -1
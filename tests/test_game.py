@@ -4,38 +4,22 @@ Tests for the Textual Tetris Game logic.
 This module contains tests for the core game logic.
 """
 
+import dataclasses
+import random
+
 import pytest
 
 from textual_tetris_game.game import (
-    Board, Direction, GameState, Position, Rotation, Tetromino, TetrominoType,
-    TETROMINO_SHAPES, calculate_level, calculate_score, check_game_over, create_tetromino, 
-    generate_next_piece, hard_drop,  move_tetromino, rotate_tetromino, update_game
+    Board, Direction, GameState, PieceBag, Rotation, Tetromino, TetrominoType,
+    TETROMINO_SHAPES, calculate_level, calculate_score, check_game_over, check_game_over_cached,
+    create_tetromino, generate_next_piece, hard_drop,  move_tetromino, rotate_tetromino,
+    shape_offsets, update_game
 )
 
 
-def test_position_move():
-    """Test the Position.move method."""
-    pos = Position(1, 1)
-    
-    # Test moving left
-    left_pos = pos.move(Direction.LEFT)
-    assert left_pos.row == 1
-    assert left_pos.col == 0
-    
-    # Test moving right
-    right_pos = pos.move(Direction.RIGHT)
-    assert right_pos.row == 1
-    assert right_pos.col == 2
-    
-    # Test moving down
-    down_pos = pos.move(Direction.DOWN)
-    assert down_pos.row == 2
-    assert down_pos.col == 1
-
-
 def test_tetromino_rotate():
     """Test the Tetromino.rotate method."""
-    pos = Position(1, 1)
+    pos = (1, 1)
     tetromino = Tetromino(TetrominoType.I, pos)
     
     # Test clockwise rotation
@@ -57,29 +41,45 @@ def test_tetromino_rotate():
     # Test counter-clockwise rotation
     rotated = tetromino.rotate(Rotation.COUNTERCLOCKWISE)
     assert rotated.rotation == 3
+    
+    # The direction-specific methods give the same pieces
+    assert tetromino.rotate_clockwise() is tetromino.rotate(Rotation.CLOCKWISE)
+    assert tetromino.rotate_counterclockwise() is rotated
 
 
 def test_tetromino_move():
     """Test the Tetromino.move method."""
-    pos = Position(1, 1)
+    pos = (1, 1)
     tetromino = Tetromino(TetrominoType.I, pos)
     
     # Test moving left
     moved = tetromino.move(Direction.LEFT)
     assert moved.type == TetrominoType.I
-    assert moved.position.row == 1
-    assert moved.position.col == 0
+    assert moved.position == (1, 0)
     assert moved.rotation == 0
     
     # Test moving right
     moved = tetromino.move(Direction.RIGHT)
-    assert moved.position.row == 1
-    assert moved.position.col == 2
+    assert moved.position == (1, 2)
     
     # Test moving down
     moved = tetromino.move(Direction.DOWN)
-    assert moved.position.row == 2
-    assert moved.position.col == 1
+    assert moved.position == (2, 1)
+    
+    # Moved pieces are shared, so they can't be changed in place
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        moved.position = (0, 0)
+    assert tetromino.move(Direction.DOWN).position == (2, 1)
+
+
+def test_tetromino_moves_are_interned():
+    """Test that moving and rotating reuse tetromino instances."""
+    tetromino = Tetromino(TetrominoType.T, (5, 5))
+    
+    moved = tetromino.move(Direction.LEFT)
+    assert moved.move(Direction.RIGHT) is moved.move(Direction.RIGHT)
+    assert moved.rotate(Rotation.CLOCKWISE) is moved.rotate(Rotation.CLOCKWISE)
+    assert moved.move(Direction.RIGHT) == tetromino
 
 
 def test_board_create_empty():
@@ -93,6 +93,16 @@ def test_board_create_empty():
     board = Board.create_empty(12, 24)
     assert board.width == 12
     assert board.height == 24
+    
+    # Empty boards of the same size are shared
+    assert Board.create_empty(12, 24) is board
+    assert Board.create_empty(width=12, height=24) is board
+    assert Board.create_empty() is Board.create_empty(10, 20)
+    assert Board.create_empty(width=10) is Board.create_empty()
+    
+    # Shared boards are frozen, so no game can change another's
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        board.row_masks = (1,) * 24
 
 
 def test_board_is_valid_position():
@@ -100,18 +110,70 @@ def test_board_is_valid_position():
     board = Board.create_empty(10, 20)
     
     # Test valid positions
-    assert board.is_valid_position(Position(0, 0))
-    assert board.is_valid_position(Position(19, 9))
+    assert board.is_valid_position(0, 0)
+    assert board.is_valid_position(19, 9)
     
     # Test invalid positions (out of bounds)
-    assert not board.is_valid_position(Position(-1, 0))
-    assert not board.is_valid_position(Position(0, -1))
-    assert not board.is_valid_position(Position(20, 0))
-    assert not board.is_valid_position(Position(0, 10))
+    assert not board.is_valid_position(-1, 0)
+    assert not board.is_valid_position(0, -1)
+    assert not board.is_valid_position(20, 0)
+    assert not board.is_valid_position(0, 10)
     
     # Test with occupied cells
-    board_with_cells = Board(10, 20, {(1, 1): TetrominoType.I})
-    assert not board_with_cells.is_valid_position(Position(1, 1))
+    board_with_cells = Board.from_cells(10, 20, {(1, 1): TetrominoType.I})
+    assert not board_with_cells.is_valid_position(1, 1)
+
+
+def test_board_place_tetromino():
+    """Test the Board.place_tetromino method."""
+    board = Board.create_empty(10, 20)
+    tetromino = Tetromino(TetrominoType.T, (18, 4), 0)
+    
+    new_board = board.place_tetromino(tetromino)
+    
+    # The original board is unchanged
+    assert len(board.cells) == 0
+    
+    # The new board has the T cells set in both the masks and the colors
+    assert new_board.row_masks[18] == 0b111 << 3
+    assert new_board.row_masks[17] == 1 << 4
+    assert new_board.cells == {
+        (18, 3): TetrominoType.T,
+        (18, 4): TetrominoType.T,
+        (18, 5): TetrominoType.T,
+        (17, 4): TetrominoType.T,
+    }
+    assert not new_board.is_valid_position(17, 4)
+    assert new_board.is_valid_position(17, 3)
+    
+    # Cells above the top of the board are dropped instead of wrapping around
+    above_board, lines_cleared = board.lock_tetromino(Tetromino(TetrominoType.T, (0, 5), 0))
+    assert lines_cleared == 0
+    assert above_board.row_masks[0] == 0b111 << 4
+    assert above_board.row_masks[19] == 0
+    assert above_board.column_tops == (20,) * 4 + (0, 0, 0) + (20,) * 3
+    assert board.place_tetromino(Tetromino(TetrominoType.T, (0, 5), 0)) == above_board
+
+
+def test_board_lock_tetromino():
+    """Test that Board.lock_tetromino places a piece and clears the lines it completes."""
+    # Row 19 is full apart from columns 4-7, where a flat I piece fits
+    cells = {(19, col): TetrominoType.J for col in range(10) if not 4 <= col <= 7}
+    cells[(18, 0)] = TetrominoType.J
+    board = Board.from_cells(10, 20, cells)
+    tetromino = Tetromino(TetrominoType.I, (19, 5), 0)
+    
+    new_board, lines_cleared = board.lock_tetromino(tetromino)
+    
+    assert lines_cleared == 1
+    assert new_board.cells == {(19, 0): TetrominoType.J}
+    assert new_board.column_tops == (19,) + (20,) * 9
+    assert (new_board, lines_cleared) == board.place_tetromino(tetromino).clear_lines()
+    
+    # Without a completed line it is the same as placing the piece
+    assert board.lock_tetromino(Tetromino(TetrominoType.I, (17, 5), 0)) == (
+        board.place_tetromino(Tetromino(TetrominoType.I, (17, 5), 0)), 0
+    )
 
 
 def test_calculate_score():
@@ -127,6 +189,10 @@ def test_calculate_score():
     assert calculate_score(1, 2) == 200
     assert calculate_score(2, 3) == 900
     assert calculate_score(4, 5) == 4000
+    
+    # Test line counts outside the scoring table
+    assert calculate_score(5, 1) == 0
+    assert calculate_score(-1, 1) == 0
 
 
 def test_calculate_level():
@@ -143,51 +209,57 @@ def test_calculate_level():
 def test_tetromino_get_cells():
     """Test the Tetromino.get_cells method."""
     # Test I-piece at rotation 0
-    tetromino = Tetromino(TetrominoType.I, Position(5, 5), 0)
+    tetromino = Tetromino(TetrominoType.I, (5, 5), 0)
     cells = tetromino.get_cells()
     assert len(cells) == 4
-    assert Position(5, 5) in cells  # Center
-    assert Position(5, 4) in cells  # Left
-    assert Position(5, 6) in cells  # Right
-    assert Position(5, 7) in cells  # Far right
+    assert (5, 5) in cells  # Center
+    assert (5, 4) in cells  # Left
+    assert (5, 6) in cells  # Right
+    assert (5, 7) in cells  # Far right
     
     # Test I-piece at rotation 1 (90 degrees)
-    tetromino = Tetromino(TetrominoType.I, Position(5, 5), 1)
+    tetromino = Tetromino(TetrominoType.I, (5, 5), 1)
     cells = tetromino.get_cells()
     assert len(cells) == 4
-    assert Position(5, 5) in cells  # Center
-    assert Position(4, 5) in cells  # Up
-    assert Position(6, 5) in cells  # Down
-    assert Position(7, 5) in cells  # Far down
+    assert (5, 5) in cells  # Center
+    assert (4, 5) in cells  # Up
+    assert (6, 5) in cells  # Down
+    assert (7, 5) in cells  # Far down
     
     # Test O-piece (should be the same at all rotations)
-    tetromino = Tetromino(TetrominoType.O, Position(5, 5), 0)
+    tetromino = Tetromino(TetrominoType.O, (5, 5), 0)
     cells = tetromino.get_cells()
     assert len(cells) == 4
-    assert Position(5, 5) in cells  # Bottom right
-    assert Position(5, 6) in cells  # Bottom left
-    assert Position(4, 5) in cells  # Top right
-    assert Position(4, 6) in cells  # Top left
+    assert (5, 5) in cells  # Bottom right
+    assert (5, 6) in cells  # Bottom left
+    assert (4, 5) in cells  # Top right
+    assert (4, 6) in cells  # Top left
+
+
+def test_tetromino_iter_cells():
+    """Test that Tetromino.iter_cells follows TETROMINO_SHAPES for every shape."""
+    for tetromino_type in TetrominoType:
+        for rotation in range(4):
+            tetromino = Tetromino(tetromino_type, (5, 5), rotation)
+            expected = [
+                (5 + row_offset, 5 + col_offset)
+                for row_offset, col_offset in TETROMINO_SHAPES[tetromino_type][rotation]
+            ]
+            assert list(tetromino.iter_cells()) == expected
+            assert tetromino.get_cells() == frozenset(expected)
+            assert shape_offsets(tetromino_type, rotation) is TETROMINO_SHAPES[tetromino_type][rotation]
 
 
 def test_board_clear_lines():
     """Test the Board.clear_lines method."""
-    # Create a board with some cells
-    cells = {}
-    
-    # Add a complete line at row 18
-    for col in range(10):
-        cells[(18, col)] = TetrominoType.I
-    
-    # Add some cells in row 17
-    cells[(17, 0)] = TetrominoType.J
-    cells[(17, 1)] = TetrominoType.J
-    
-    # Add a complete line at row 16
-    for col in range(10):
-        cells[(16, col)] = TetrominoType.T
-    
-    board = Board(10, 20, cells)
+    # Create a board with complete lines at rows 16 and 18, and some cells in row 17
+    cells = {
+        **{(18, col): TetrominoType.I for col in range(10)},
+        (17, 0): TetrominoType.J,
+        (17, 1): TetrominoType.J,
+        **{(16, col): TetrominoType.T for col in range(10)},
+    }
+    board = Board.from_cells(10, 20, cells)
     
     # Clear lines
     new_board, lines_cleared = board.clear_lines()
@@ -203,6 +275,27 @@ def test_board_clear_lines():
     assert (18, 1) in new_board.cells
     assert new_board.cells[(18, 0)] == TetrominoType.J
     assert new_board.cells[(18, 1)] == TetrominoType.J
+    
+    # Only the touched rows are checked for completion
+    assert board.clear_lines([17]) == (board, 0)
+    partial_board, lines_cleared = board.clear_lines([18, 17])
+    assert lines_cleared == 1
+    assert partial_board.row_masks[17] == (1 << 10) - 1  # Row 16 shifted down
+    assert partial_board.row_masks[18] == 0b11  # Row 17 shifted down
+    
+    # Rows above the board (from a piece locked partly above it) are ignored
+    # instead of counting from the bottom
+    small_board = Board.create_empty(4, 4).fill_row(3, TetrominoType.I)
+    assert small_board.clear_lines([-1, 0]) == (small_board, 0)
+    
+    # Filling a row directly gives the same board as filling its cells
+    assert Board.from_cells(10, 20, {}).fill_row(18, TetrominoType.I) == Board.from_cells(
+        10, 20, {(18, col): TetrominoType.I for col in range(10)}
+    )
+    filled_board, lines_cleared = board.fill_row(17, TetrominoType.S).clear_lines()
+    assert lines_cleared == 3
+    assert filled_board == Board.create_empty(10, 20)
+    assert filled_board.column_tops == (20,) * 10
 
 
 def test_check_game_over():
@@ -214,11 +307,9 @@ def test_check_game_over():
     assert not check_game_over(board, TetrominoType.I)
     
     # Create a board with cells at the top center
-    cells = {}
-    for col in range(4, 7):  # Block the center of the top row
-        cells[(1, col)] = TetrominoType.I
+    cells = {(1, col): TetrominoType.I for col in range(4, 7)}  # Block the center of the top row
     
-    board_with_top_center_cells = Board(10, 20, cells)
+    board_with_top_center_cells = Board.from_cells(10, 20, cells)
     
     # Game should be over if a piece can't be placed at the top center
     assert check_game_over(board_with_top_center_cells, TetrominoType.I)
@@ -231,13 +322,64 @@ def test_check_game_over():
     cells_left[(1, 0)] = TetrominoType.I
     cells_left[(1, 1)] = TetrominoType.I
     
-    board_with_top_left_cells = Board(10, 20, cells_left)
+    board_with_top_left_cells = Board.from_cells(10, 20, cells_left)
     
     # Game should be over for O tetromino if its spawn area is blocked
     assert check_game_over(board_with_top_left_cells, TetrominoType.O)
     
     # But O tetromino should fit if center is blocked but left is clear
     assert not check_game_over(board_with_top_center_cells, TetrominoType.O)
+    
+    # No piece can spawn on a board too short to hold its spawn rows
+    for tetromino_type in TetrominoType:
+        assert check_game_over(Board.create_empty(10, 1), tetromino_type)
+    assert not check_game_over(Board.create_empty(10, 2), TetrominoType.O)
+
+
+def test_check_game_over_cached():
+    """Test that check_game_over_cached agrees with check_game_over for equal boards."""
+    cells = {(1, col): TetrominoType.I for col in range(4, 7)}
+    for tetromino_type in TetrominoType:
+        board = Board.from_cells(10, 20, cells)
+        expected = check_game_over(board, tetromino_type)
+        assert check_game_over_cached(board, tetromino_type) == expected
+        
+        # An equal board built separately hits the cache
+        hits = check_game_over_cached.cache_info().hits
+        assert check_game_over_cached(Board.from_cells(10, 20, cells), tetromino_type) == expected
+        assert check_game_over_cached.cache_info().hits == hits + 1
+
+
+def test_generate_next_piece_uses_bag():
+    """Test that generate_next_piece deals every type once per bag of 7."""
+    board = Board.create_empty()
+    bag = PieceBag()
+    types = [generate_next_piece(board, bag).type for _ in range(70)]
+    
+    for start in range(0, 70, 7):
+        assert sorted(types[start:start + 7]) == sorted(TetrominoType)
+
+
+def test_generate_next_piece_with_rng():
+    """Test that games with the same seed deal the same pieces from their own bags."""
+    first = GameState.new_game(rng=random.Random(7))
+    second = GameState.new_game(rng=random.Random(7))
+    
+    # Interleave the draws; neither game takes pieces from the other's bag
+    first_types = []
+    second_types = []
+    for _ in range(14):
+        first_types.append(generate_next_piece(first.board, first.bag).type)
+        second_types.append(generate_next_piece(second.board, second.bag).type)
+    
+    assert first_types == second_types
+    assert sorted(first_types[:7]) == sorted(TetrominoType)
+    assert sorted(first_types[7:]) == sorted(TetrominoType)
+    
+    # Starting another game leaves a game in progress with its partial bag
+    first.bag.draw()
+    GameState.new_game()
+    assert len(first.bag.types) == 6
 
 
 def test_game_state_new_game():
@@ -257,3 +399,47 @@ def test_game_state_new_game():
     state = GameState.new_game(12, 24)
     assert state.board.width == 12
     assert state.board.height == 24
+
+
+def test_hard_drop():
+    """Test that hard_drop drops the current piece to the floor and locks it."""
+    state = GameState.new_game()
+    state.current_piece = Tetromino(TetrominoType.I, (0, 5), 0)
+    state.next_piece = Tetromino(TetrominoType.T, (0, 5), 0)
+    
+    new_state = hard_drop(state)
+    
+    # The state is updated in place
+    assert new_state is state
+    assert state.current_piece is None
+    assert state.board.row_masks[19] == 0b1111 << 4
+    assert not state.game_over
+
+
+def test_update_game_spawns_pieces():
+    """Test that update_game promotes the next piece to the current piece."""
+    state = GameState.new_game()
+    
+    update_game(state)
+    assert state.current_piece is not None
+    assert state.next_piece is not None
+    
+    next_piece = state.next_piece
+    state.current_piece = None
+    update_game(state)
+    assert state.current_piece == next_piece
+
+
+def test_hard_drop_under_overhang():
+    """Test that hard_drop lands a piece tucked under an overhang correctly."""
+    # Overhang across columns 3-6 at row 10, with the floor below it clear
+    cells = {(10, col): TetrominoType.J for col in range(3, 7)}
+    state = GameState.new_game()
+    state.board = Board.from_cells(10, 20, cells)
+    state.current_piece = Tetromino(TetrominoType.I, (12, 4), 0)
+    state.next_piece = Tetromino(TetrominoType.T, (0, 5), 0)
+    
+    hard_drop(state)
+    
+    assert state.board.row_masks[19] == 0b1111 << 3
+    assert state.board.column_tops == (20, 20, 20, 10, 10, 10, 10, 20, 20, 20)